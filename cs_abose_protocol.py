@@ -2,7 +2,7 @@
 # Built upon the Abose et al. (2024) protocol.
 # FINAL VERSION: Removed faulty sklearn dependency to focus on energy modeling.
 
-import math, random
+import math
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -17,6 +17,8 @@ E_DA = 0.5e-9 # Corrected value as per our previous discussion
 E_FS = 10e-12
 E_MP = 0.0013e-12
 DO = math.sqrt(E_FS / E_MP) if E_MP > 0 else 87.0
+DO2 = DO * DO # compare squared distances against the squared crossover
+MAX_DIST = math.hypot(AREA_SIDE/2, AREA_SIDE/2) # farthest possible node-BS distance
 INITIAL_ENERGY = 0.5
 P_OPT = 0.05
 SEED = 42
@@ -27,8 +29,9 @@ CS_RATIO = 0.25 # Compress data to 25% of its original size
 # The total bits sent will depend on the number of members in the cluster.
 BITS_PER_MEASUREMENT = 64 
 
-random.seed(SEED)
-np.random.seed(SEED)
+# All randomness flows through one module-level Generator so a fresh
+# import (e.g. in a worker process) reproduces the same simulation.
+rng = np.random.default_rng(SEED)
 
 class Node:
     def __init__(self, nid, x, y, energy=INITIAL_ENERGY):
@@ -40,57 +43,82 @@ class Node:
         self.is_CH = False
         self.cluster = None
         self.times_as_CH = 0
-
-    def distance_to(self, pos):
-        return math.hypot(self.x - pos[0], self.y - pos[1])
-
-def tx_energy(bits, dist):
-    if dist <= DO:
-        return bits * (E_ELEC + E_FS * (dist**2))
-    else:
-        return bits * (E_ELEC + E_MP * (dist**4))
+        # Positions are static, so the BS distance never changes; compute once,
+        # along with the per-bit TX coefficient for the fixed CH-to-BS link.
+        self.dist_bs = math.hypot(x - BS_POS[0], y - BS_POS[1])
+        if self.dist_bs <= DO:
+            self.coeff_bs = E_ELEC + E_FS * self.dist_bs**2
+        else:
+            self.coeff_bs = E_ELEC + E_MP * self.dist_bs**4
+        # Coverage factor of the CS-aware threshold depends only on position.
+        self.coverage_factor = (1 - self.dist_bs / MAX_DIST) * P_OPT * 2
 
 def rx_energy(bits):
     return bits * E_ELEC
 
+def tx_coeff(d2):
+    # Per-bit TX energy coefficient from *squared* distance: branch-free and
+    # sqrt-free, since the radio model only ever needs d^2 and d^4.
+    return E_ELEC + np.where(d2 <= DO2, E_FS * d2, E_MP * d2 * d2)
+
 def create_nodes(n=N_NODES):
-    return [Node(i, random.uniform(0, AREA_SIDE), random.uniform(0, AREA_SIDE)) for i in range(n)]
-
-def compute_cs_aware_threshold(node, round_num, nodes, p=P_OPT, w_energy=0.7, w_data=0.3):
-    alive_nodes = [n for n in nodes if n.is_alive]
-    if not alive_nodes: return 0
-    E_total = sum(n.energy for n in alive_nodes)
-    E_avg = E_total / len(alive_nodes)
-    energy_factor = p * (node.energy / E_avg) if E_avg > 0 else p
-    
-    dist_from_center = node.distance_to(BS_POS)
-    max_dist = math.hypot(AREA_SIDE/2, AREA_SIDE/2)
-    coverage_factor = (1 - dist_from_center / max_dist) * p * 2
-    
-    Pi_cs = (w_energy * energy_factor) + (w_data * coverage_factor)
-    Pi_cs = max(min(Pi_cs, 0.5), 0.001)
-
-    try:
-        threshold = Pi_cs / (1 - Pi_cs * (round_num % int(1.0 / Pi_cs)))
-    except (ValueError, ZeroDivisionError):
-        threshold = Pi_cs
-    return threshold
+    # One C-level RNG call per coordinate array instead of 2N Python calls.
+    x = rng.uniform(0, AREA_SIDE, n)
+    y = rng.uniform(0, AREA_SIDE, n)
+    return [Node(i, x[i], y[i]) for i in range(n)]
+
+def compute_cs_aware_thresholds(energies, coverage_factors, round_num,
+                                p=P_OPT, w_energy=0.7, w_data=0.3):
+    """Vectorized CS-aware threshold for all alive nodes at once.
+
+    E_avg is computed once per round instead of once per node, and the
+    modular-threshold formula is evaluated as one NumPy expression.
+    """
+    if energies.size == 0:
+        return energies
+    E_avg = energies.sum() / energies.size
+    if E_avg > 0:
+        energy_factor = p * energies / E_avg
+    else:
+        energy_factor = np.full(energies.size, p)
+
+    Pi_cs = np.clip(w_energy * energy_factor + w_data * coverage_factors, 0.001, 0.5)
+    # Pi_cs is clamped to [0.001, 0.5], so int(1/Pi_cs) >= 2 and the
+    # denominator stays positive; no try/except needed in vector form.
+    period = (1.0 / Pi_cs).astype(np.int64)
+    return Pi_cs / (1.0 - Pi_cs * (round_num % period))
 
 def run_cs_abose_simulation(rounds=2000):
     nodes = create_nodes(N_NODES)
-    residual_energy = []
-    alive_nodes_count = []
-    
+    # Preallocated result columns: zeros double as padding if the network
+    # dies before the last round.
+    alive_arr = np.zeros(rounds, dtype=np.int32)
+    energy_arr = np.zeros(rounds, dtype=np.float64)
+    n_alive = len(nodes)
+    # Running residual-energy total, maintained incrementally at each debit
+    # and death instead of re-summed over all nodes every round.
+    e_total = sum(n.energy for n in nodes)
+    # The coverage factors are static, so the lookup table is built once and
+    # gathered by node id each round instead of rebuilt from attributes.
+    coverage_all = np.array([n.coverage_factor for n in nodes])
+    # Loop-invariant debits, hoisted out of the per-member/per-CH loops.
+    e_rx = rx_energy(PACKET_SIZE)
+    e_da_per_member = PACKET_SIZE * E_DA
+
     for r in range(1, rounds + 1):
         alive_nodes = [n for n in nodes if n.is_alive]
         if not alive_nodes: break
 
+        energies = np.array([n.energy for n in alive_nodes])
+        coverage = coverage_all[[n.id for n in alive_nodes]]
+        T = compute_cs_aware_thresholds(energies, coverage, r)
+        draws = rng.random(len(alive_nodes))
+
         CHs = []
-        for node in alive_nodes:
+        for node, elected in zip(alive_nodes, draws <= T):
             node.is_CH = False
             node.cluster = None
-            T = compute_cs_aware_threshold(node, r, nodes)
-            if random.random() <= T:
+            if elected:
                 node.is_CH = True
                 CHs.append(node)
 
@@ -99,28 +127,42 @@ def run_cs_abose_simulation(rounds=2000):
             best_node.is_CH = True
             CHs.append(best_node)
 
-        for node in alive_nodes:
-            if not node.is_CH and CHs:
-                node.cluster = min(CHs, key=lambda ch: node.distance_to((ch.x, ch.y)))
-            
-        for node in alive_nodes:
-            if not node.is_CH and node.cluster and node.cluster.is_alive:
-                dist = node.distance_to((node.cluster.x, node.cluster.y))
-                node.energy -= tx_energy(PACKET_SIZE, dist)
-                node.cluster.energy -= rx_energy(PACKET_SIZE)
-                if node.energy <= 0: node.is_alive = False
-
-        for ch in CHs:
+        members = [n for n in alive_nodes if not n.is_CH]
+        if members and CHs:
+            # One broadcast replaces the O(members x CHs) min(..., key=hypot) scan.
+            mx = np.array([n.x for n in members]); my = np.array([n.y for n in members])
+            cx = np.array([ch.x for ch in CHs]); cy = np.array([ch.y for ch in CHs])
+            d2 = (mx[:, None] - cx[None, :])**2 + (my[:, None] - cy[None, :])**2
+            nearest = np.argmin(d2, axis=1)
+            member_tx = PACKET_SIZE * tx_coeff(d2[np.arange(len(members)), nearest])
+
+            for node, j, e_tx in zip(members, nearest, member_tx):
+                node.cluster = CHs[j]
+                if node.cluster.is_alive:
+                    node.energy -= e_tx
+                    node.cluster.energy -= e_rx
+                    e_total -= e_tx + e_rx
+                    if node.energy <= 0:
+                        node.is_alive = False
+                        n_alive -= 1
+                        e_total -= node.energy  # drop the (<= 0) residual
+            # One bincount over the assignments replaces a per-CH member scan.
+            ch_members = np.bincount(nearest, minlength=len(CHs))
+        else:
+            ch_members = np.zeros(len(CHs), dtype=np.int64)
+
+        for j, ch in enumerate(CHs):
             if not ch.is_alive: continue
             
-            cluster_members = [n for n in alive_nodes if n.cluster == ch]
-            num_members = len(cluster_members)
-            
+            num_members = int(ch_members[j])
+
             # --- CORRECTED ENERGY MODEL FOR COMPRESSION ---
             if num_members > 0:
                 # Energy for data aggregation for all member packets
-                ch.energy -= num_members * PACKET_SIZE * E_DA
-                
+                e_agg = num_members * e_da_per_member
+                ch.energy -= e_agg
+                e_total -= e_agg
+
                 # Calculate the size of the compressed packet
                 # n_components = number of compressed measurements
                 n_components = int(num_members * CS_RATIO)
@@ -132,20 +174,20 @@ def run_cs_abose_simulation(rounds=2000):
                     total_bits_transmitted = n_components * BITS_PER_MEASUREMENT
 
                 # Energy for transmitting the final packet (either compressed or not) to BS
-                dist_bs = ch.distance_to(BS_POS)
-                ch.energy -= tx_energy(total_bits_transmitted, dist_bs)
-            
-            if ch.energy <= 0: ch.is_alive = False
+                e_bs = total_bits_transmitted * ch.coeff_bs
+                ch.energy -= e_bs
+                e_total -= e_bs
+
+            if ch.energy <= 0:
+                ch.is_alive = False
+                n_alive -= 1
+                e_total -= ch.energy  # drop the (<= 0) residual
 
-        alive_nodes_count.append(sum(1 for n in nodes if n.is_alive))
-        residual_energy.append(sum(n.energy for n in nodes if n.is_alive))
+        alive_arr[r - 1] = n_alive
+        energy_arr[r - 1] = e_total
 
-    # Pad results if simulation ends early
-    while len(alive_nodes_count) < rounds:
-        alive_nodes_count.append(0)
-        residual_energy.append(0)
-        
     # We now only return the two essential dataframes
-    return pd.DataFrame({'round': range(1, rounds + 1), 'alive_nodes': alive_nodes_count}), \
-           pd.DataFrame({'round': range(1, rounds + 1), 'residual_energy': residual_energy})
+    rounds_col = np.arange(1, rounds + 1, dtype=np.int32)
+    return pd.DataFrame({'round': rounds_col, 'alive_nodes': alive_arr}), \
+           pd.DataFrame({'round': rounds_col, 'residual_energy': energy_arr})
 
@@ -1,9 +1,9 @@
 # eerpms_protocol.py - Implementation of Yao et al. "EERPMS"
 
-import math, random
+import math
+from dataclasses import dataclass
 import pandas as pd
 import numpy as np
-from collections import defaultdict
 
 # --- Standard Parameters ---
 N_NODES = 100
@@ -15,122 +15,136 @@ E_DA = 0.5e-9
 E_FS = 10e-12
 E_MP = 0.0013e-12
 DO = math.sqrt(E_FS / E_MP) if E_MP > 0 else 87.0
+DO2 = DO * DO # compare squared distances against the squared crossover
 INITIAL_ENERGY = 0.5
 SEED = 42
+# Node state is stored in float32, as in abose_protocol: the simulation's
+# numerical range fits comfortably and the working set halves.
+DTYPE = np.float32
 
 # Protocol-specific parameters for CH selection (Attribute Function)
 W1_ENERGY = 0.7 # w1 in the paper
 W2_LOCATION = 0.3 # w2 in the paper
 
-random.seed(SEED)
-np.random.seed(SEED)
-
-class Node:
-    def __init__(self, nid, x, y, energy=INITIAL_ENERGY):
-        self.id = nid; self.x = x; self.y = y; self.energy = energy
-        self.is_alive = True; self.is_CH = False; self.cluster_id = -1
-
-def tx_energy(bits, dist):
-    if dist <= DO: return bits * (E_ELEC + E_FS * (dist**2))
-    else: return bits * (E_ELEC + E_MP * (dist**4))
+# All randomness flows through one module-level Generator so a fresh
+# import (e.g. in a worker process) reproduces the same simulation.
+rng = np.random.default_rng(SEED)
+
+@dataclass
+class NodeArrays:
+    # Structure-of-arrays node state, as in abose_protocol: one contiguous
+    # array per field so per-round updates are NumPy vector ops.
+    x: np.ndarray        # DTYPE, node x coordinates
+    y: np.ndarray        # DTYPE, node y coordinates
+    energy: np.ndarray   # DTYPE, residual energy per node
+    alive: np.ndarray    # bool
+    is_CH: np.ndarray    # bool
+    dist_bs: np.ndarray  # DTYPE, distance to the BS (static, computed once)
+    coeff_bs: np.ndarray # DTYPE, per-bit TX energy coefficient to the BS (static)
+    angle_bs: np.ndarray # DTYPE, polar angle to the BS in [0, 360) (static)
 
 def rx_energy(bits): return bits * E_ELEC
 
+def tx_coeff(d2):
+    # Per-bit TX energy coefficient from *squared* distance: branch-free and
+    # sqrt-free, since the radio model only ever needs d^2 and d^4.
+    return E_ELEC + np.where(d2 <= DO2, E_FS * d2, E_MP * d2 * d2)
+
 def create_nodes(n=N_NODES):
-    # Create nodes within a circular area
-    nodes = []
-    for i in range(n):
-        r = AREA_RADIUS * math.sqrt(random.random())
-        theta = random.random() * 2 * math.pi
-        x = r * math.cos(theta)
-        y = r * math.sin(theta)
-        nodes.append(Node(i, x + BS_POS[0], y + BS_POS[1]))
-    return nodes
+    # Create nodes within a circular area with two batched RNG draws.
+    radii = AREA_RADIUS * np.sqrt(rng.random(n))
+    theta = rng.random(n) * 2 * np.pi
+    x = (radii * np.cos(theta) + BS_POS[0]).astype(DTYPE)
+    y = (radii * np.sin(theta) + BS_POS[1]).astype(DTYPE)
+    dist_bs = np.hypot(x - BS_POS[0], y - BS_POS[1]).astype(DTYPE)
+    return NodeArrays(x=x, y=y,
+                      energy=np.full(n, INITIAL_ENERGY, dtype=DTYPE),
+                      alive=np.ones(n, dtype=bool),
+                      is_CH=np.zeros(n, dtype=bool),
+                      dist_bs=dist_bs,
+                      coeff_bs=tx_coeff(dist_bs * dist_bs),
+                      angle_bs=np.mod(np.degrees(np.arctan2(y - BS_POS[1],
+                                                            x - BS_POS[0])), 360.0))
 
 def run_eerpms_simulation(rounds=2000):
-    nodes = create_nodes(N_NODES)
-    alive_nodes_count = []
-    
+    na = create_nodes(N_NODES)
+    # Preallocated result column: zeros double as padding if the network
+    # dies before the last round.
+    alive_arr = np.zeros(rounds, dtype=np.int32)
+    n_alive = N_NODES
+
     for r in range(1, rounds + 1):
-        alive_nodes = [n for n in nodes if n.is_alive]
-        num_alive = len(alive_nodes)
-        if num_alive == 0: break
+        if n_alive == 0: break
+        alive_idx = np.flatnonzero(na.alive)
 
         # --- Centralized Calculation at BS ---
         # 1. Calculate optimal K* and d_CHtoBS (Eqs. 15 & 16 in paper)
         try:
-            k_opt = int(round(( (3/4) * (math.pi**2) * num_alive )**(1/3.0)))
+            k_opt = int(round(( (3/4) * (math.pi**2) * n_alive )**(1/3.0)))
             k_opt = max(1, k_opt) # Ensure at least one cluster
-            d_opt = math.sqrt((2 * num_alive * AREA_RADIUS**2) / (3 * (num_alive + k_opt)))
+            d_opt = math.sqrt((2 * n_alive * AREA_RADIUS**2) / (3 * (n_alive + k_opt)))
         except (ValueError, ZeroDivisionError):
             k_opt = 1; d_opt = AREA_RADIUS / 2
 
         # 2. Cluster Formation based on Angle (simplified Otsu)
-        clusters = defaultdict(list)
         sector_angle = 360 / k_opt
-        for node in alive_nodes:
-            angle = math.degrees(math.atan2(node.y - BS_POS[1], node.x - BS_POS[0]))
-            if angle < 0: angle += 360
-            node.cluster_id = int(angle / sector_angle)
-            clusters[node.cluster_id].append(node)
-
-        # 3. CH Selection in each cluster
-        CHs = []
-        for cid, cluster_nodes in clusters.items():
-            if not cluster_nodes: continue
-
-            # Calculate distances to optimal circle for normalization
-            dist_to_opt_circle = [abs(math.hypot(n.x - BS_POS[0], n.y - BS_POS[1]) - d_opt) for n in cluster_nodes]
-            d_max = max(dist_to_opt_circle); d_min = min(dist_to_opt_circle)
-            
-            best_node_for_ch = None
-            max_score = -float('inf')
-
-            for i, node in enumerate(cluster_nodes):
-                # Attribute Function F2(Si) (Eq. 34 in paper)
-                energy_term = W1_ENERGY * (node.energy / INITIAL_ENERGY)
-                
-                # Location term requires normalization within the cluster
-                dist_val = dist_to_opt_circle[i]
-                if (d_max - d_min) > 1e-6:
-                    location_term = W2_LOCATION * ((d_max - dist_val) / (d_max - d_min))
-                else:
-                    location_term = W2_LOCATION # All are equidistant
-                
-                score = energy_term + location_term
-                if score > max_score:
-                    max_score = score
-                    best_node_for_ch = node
-            
-            if best_node_for_ch:
-                best_node_for_ch.is_CH = True
-                CHs.append(best_node_for_ch)
-        
+        sector = (na.angle_bs / sector_angle).astype(np.int32)
+
+        # 3. CH Selection in each cluster: a stable argsort turns each sector
+        # into a contiguous slice, so the per-cluster normalization bounds come
+        # from np.maximum/minimum.reduceat and every node is scored at once
+        # (Attribute Function F2(Si), Eq. 34 in paper).
+        order = np.argsort(sector[alive_idx], kind='stable')
+        sorted_idx = alive_idx[order]
+        s_sorted = sector[sorted_idx]
+        starts = np.flatnonzero(np.r_[True, s_sorted[1:] != s_sorted[:-1]])
+        counts = np.diff(np.append(starts, s_sorted.size))
+        seg_of = np.repeat(np.arange(starts.size), counts)
+
+        dist_to_opt = np.abs(na.dist_bs[sorted_idx] - d_opt)
+        d_max = np.maximum.reduceat(dist_to_opt, starts)
+        d_min = np.minimum.reduceat(dist_to_opt, starts)
+        spread = d_max[seg_of] - d_min[seg_of]
+        # Location term requires normalization within the cluster; sectors
+        # whose nodes are all equidistant get the full W2 weight.
+        location_term = np.where(spread > 1e-6,
+                                 W2_LOCATION * (d_max[seg_of] - dist_to_opt) /
+                                 np.where(spread > 1e-6, spread, 1.0),
+                                 W2_LOCATION)
+        score = W1_ENERGY * (na.energy[sorted_idx] / INITIAL_ENERGY) + location_term
+
+        ch_idx = np.empty(starts.size, dtype=np.int64)
+        for s in range(starts.size):
+            a = starts[s]; b = a + counts[s]
+            ch_idx[s] = sorted_idx[a + np.argmax(score[a:b])]
+        na.is_CH[ch_idx] = True
+
         # --- Data Transmission and Energy Dissipation ---
-        for node in alive_nodes:
-            if not node.is_CH:
-                # Find its CH
-                my_ch = next((ch for ch in CHs if ch.cluster_id == node.cluster_id), None)
-                if my_ch and my_ch.is_alive:
-                    dist = math.hypot(node.x - my_ch.x, node.y - my_ch.y)
-                    node.energy -= tx_energy(PACKET_SIZE, dist)
-                    my_ch.energy -= rx_energy(PACKET_SIZE)
-                    if node.energy <= 0: node.is_alive = False
-        
-        for ch in CHs:
-            if not ch.is_alive: continue
-            members_count = sum(1 for n in alive_nodes if not n.is_CH and n.cluster_id == ch.cluster_id)
-            ch.energy -= members_count * PACKET_SIZE * E_DA
-            dist_bs = math.hypot(ch.x - BS_POS[0], ch.y - BS_POS[1])
-            ch.energy -= tx_energy(PACKET_SIZE * (members_count + 1), dist_bs)
-            if ch.energy <= 0: ch.is_alive = False
-            
+        ch_of_sector = np.full(int(sector.max()) + 1, -1, dtype=np.int64)
+        ch_of_sector[sector[ch_idx]] = ch_idx
+
+        member_idx = np.flatnonzero(na.alive & ~na.is_CH)
+        my_ch = ch_of_sector[sector[member_idx]]
+        served = my_ch >= 0
+        m = member_idx[served]; c = my_ch[served]
+        if m.size:
+            d2 = (na.x[m] - na.x[c])**2 + (na.y[m] - na.y[c])**2
+            na.energy[m] -= PACKET_SIZE * tx_coeff(d2)
+            dead = m[na.energy[m] <= 0]
+            na.alive[dead] = False
+            n_alive -= dead.size
+
+        members_count = np.bincount(sector[m], minlength=ch_of_sector.size)[sector[ch_idx]]
+        na.energy[ch_idx] -= members_count * (PACKET_SIZE * (E_ELEC + E_DA))
+        na.energy[ch_idx] -= PACKET_SIZE * (members_count + 1) * na.coeff_bs[ch_idx]
+        dead_chs = ch_idx[na.energy[ch_idx] <= 0]
+        na.alive[dead_chs] = False
+        n_alive -= dead_chs.size
+
         # Reset CH status for next round
-        for node in nodes: node.is_CH = False
+        na.is_CH[:] = False
 
-        alive_nodes_count.append(sum(1 for n in nodes if n.is_alive))
+        alive_arr[r - 1] = n_alive
 
-    # Pad results if simulation ends early
-    while len(alive_nodes_count) < rounds: alive_nodes_count.append(0)
-        
-    return pd.DataFrame({'round': range(1, rounds + 1), 'alive_nodes': alive_nodes_count}), None
+    return pd.DataFrame({'round': np.arange(1, rounds + 1, dtype=np.int32),
+                         'alive_nodes': alive_arr}), None
@@ -1,4 +1,4 @@
-
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 # Import all protocol runners
@@ -14,41 +14,30 @@ ROUNDS = 2000
 OUTPUT_DIR = Path("simulation_results_final")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# The six simulations are independent and CPU-bound, so they run as parallel
+# worker processes. Each worker re-imports its protocol module and therefore
+# re-runs the module-level seeding, so results match a serial run.
+SIMULATIONS = [
+    ("CS-Abose (Proposed)", run_cs_abose_simulation, "cs_abose_alive.csv"),
+    ("Abose (Original)",    run_abose_simulation,    "abose_alive.csv"),
+    ("Sector-Based",        run_sector_simulation,   "sector_alive.csv"),
+    ("RLBEEP",              run_rlbeep_simulation,   "rlbeep_alive.csv"),
+    ("MRP-GTCO",            run_mrpgtco_simulation,  "mrpgtco_alive.csv"),
+    ("EERPMS",              run_eerpms_simulation,   "eerpms_alive.csv"),
+]
+
 def main():
     print("--- Starting Full Comparative Simulation ---")
-    
-    # Run Proposed Method
-    print("1/6: Running CS-Abose (Proposed)...")
-    # FIX: CS-Abose now returns 2 items, not 3
-    df_alive_cs, df_energy_cs = run_cs_abose_simulation(rounds=ROUNDS)
-    df_alive_cs.to_csv(OUTPUT_DIR / "cs_abose_alive.csv", index=False)
-    print("   ...CS-Abose complete.")
-    
-    # Run the baselines
-    print("2/6: Running Abose (Original)...")
-    df_alive_abose, _ = run_abose_simulation(rounds=ROUNDS)
-    df_alive_abose.to_csv(OUTPUT_DIR / "abose_alive.csv", index=False)
-    print("   ...Abose complete.")
-    
-    print("3/6: Running Sector-Based...")
-    df_alive_sector, _ = run_sector_simulation(rounds=ROUNDS)
-    df_alive_sector.to_csv(OUTPUT_DIR / "sector_alive.csv", index=False)
-    print("   ...Sector-Based complete.")
-    
-    print("4/6: Running RLBEEP...")
-    df_alive_rlbeep, _ = run_rlbeep_simulation(rounds=ROUNDS)
-    df_alive_rlbeep.to_csv(OUTPUT_DIR / "rlbeep_alive.csv", index=False)
-    print("   ...RLBEEP complete.")
-    
-    print("5/6: Running MRP-GTCO...")
-    df_alive_mrpgtco, _ = run_mrpgtco_simulation(rounds=ROUNDS)
-    df_alive_mrpgtco.to_csv(OUTPUT_DIR / "mrpgtco_alive.csv", index=False)
-    print("   ...MRP-GTCO complete.")
-    
-    print("6/6: Running EERPMS...")
-    df_alive_eerpms, _ = run_eerpms_simulation(rounds=ROUNDS)
-    df_alive_eerpms.to_csv(OUTPUT_DIR / "eerpms_alive.csv", index=False)
-    print("   ...EERPMS complete.")
+    print(f"Dispatching {len(SIMULATIONS)} protocols to worker processes...")
+
+    with ProcessPoolExecutor(max_workers=len(SIMULATIONS)) as executor:
+        futures = {executor.submit(fn, ROUNDS): (name, out_file)
+                   for name, fn, out_file in SIMULATIONS}
+        for future in as_completed(futures):
+            name, out_file = futures[future]
+            df_alive, _ = future.result()
+            df_alive.to_csv(OUTPUT_DIR / out_file, index=False)
+            print(f"   ...{name} complete.")
 
     print("\n--- All simulations complete! ---")
     print(f"Results are saved in the '{OUTPUT_DIR}' folder.")
@@ -56,4 +45,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -1,9 +1,8 @@
 # mrpgtco_protocol.py - FINAL CORRECTED Implementation of Yao et al. "MRP-GTCO"
 
-import math, random
+import math
 import pandas as pd
 import numpy as np
-from collections import defaultdict
 
 # --- Standard Parameters ---
 N_NODES = 100
@@ -15,17 +14,21 @@ E_DA = 0.5e-9
 E_FS = 10e-12
 E_MP = 0.0013e-12
 DO = math.sqrt(E_FS / E_MP)
+DO2 = DO * DO # compare squared distances against the squared crossover
 INITIAL_ENERGY = 0.5
 SEED = 42
 
 # Protocol-specific parameters
 COMM_RADIUS = 40  # For neighbor discovery in game theory phase
 CH_COVERAGE_RADIUS = 45 # For final CH selection coverage
+COMM_R2 = COMM_RADIUS**2
+COV_R2 = CH_COVERAGE_RADIUS**2
 W_ALPHA = 0.7  # Weight for energy in penalty function
 W_BETA = 0.3   # Weight for node degree in penalty function
 
-random.seed(SEED)
-np.random.seed(SEED)
+# All randomness flows through one module-level Generator so a fresh
+# import (e.g. in a worker process) reproduces the same simulation.
+rng = np.random.default_rng(SEED)
 
 class Node:
     def __init__(self, nid, x, y, energy=INITIAL_ENERGY):
@@ -36,19 +39,42 @@ class Node:
         self.is_alive = True
         self.is_CH = False
         self.cluster = None
-
-def tx_energy(bits, dist):
-    if dist <= DO: return bits * (E_ELEC + E_FS * (dist**2))
-    else: return bits * (E_ELEC + E_MP * (dist**4))
+        # Positions are static, so the BS distance never changes; compute once,
+        # along with the per-bit TX coefficient for the fixed CH-to-BS link.
+        self.dist_bs = math.hypot(x - BS_POS[0], y - BS_POS[1])
+        if self.dist_bs <= DO:
+            self.coeff_bs = E_ELEC + E_FS * self.dist_bs**2
+        else:
+            self.coeff_bs = E_ELEC + E_MP * self.dist_bs**4
 
 def rx_energy(bits): return bits * E_ELEC
 
+def tx_coeff(d2):
+    # Per-bit TX energy coefficient from *squared* distance: branch-free and
+    # sqrt-free, since the radio model only ever needs d^2 and d^4.
+    return E_ELEC + np.where(d2 <= DO2, E_FS * d2, E_MP * d2 * d2)
+
 def create_nodes(n=N_NODES):
-    return [Node(i, random.uniform(0, AREA_SIDE), random.uniform(0, AREA_SIDE)) for i in range(n)]
+    # One C-level RNG call per coordinate array instead of 2N Python calls.
+    x = rng.uniform(0, AREA_SIDE, n)
+    y = rng.uniform(0, AREA_SIDE, n)
+    return [Node(i, x[i], y[i]) for i in range(n)]
 
 def run_mrpgtco_simulation(rounds=2000):
     nodes = create_nodes(N_NODES)
-    alive_nodes_count = []
+    # Preallocated result column: zeros double as padding if the network
+    # dies before the last round.
+    alive_arr = np.zeros(rounds, dtype=np.int32)
+    n_alive = len(nodes)
+
+    # Positions are static, so the full pairwise squared-distance matrix and
+    # the COMM_RADIUS neighbor mask are computed once per simulation.
+    xs = np.array([n.x for n in nodes]); ys = np.array([n.y for n in nodes])
+    d2_all = (xs[:, None] - xs[None, :])**2 + (ys[:, None] - ys[None, :])**2
+    neighbor_mask = (d2_all < COMM_R2) & ~np.eye(len(nodes), dtype=bool)
+    cover_mask = d2_all <= COV_R2
+    # Loop-invariant member-to-CH receive debit, hoisted out of the hot loop.
+    e_rx = rx_energy(PACKET_SIZE)
     
     for r in range(1, rounds + 1):
         alive_nodes = [n for n in nodes if n.is_alive]
@@ -59,43 +85,35 @@ def run_mrpgtco_simulation(rounds=2000):
             node.cluster = None
 
         # --- Stage 1: Candidate CH Selection (Game Theory) ---
-        candidate_chs = []
-        for node in alive_nodes:
-            neighbors = [n for n in alive_nodes if n.id != node.id and math.hypot(node.x - n.x, node.y - n.y) < COMM_RADIUS]
-            if not neighbors: continue
-            
-            er_max = max(n.energy for n in neighbors)
-            er_min = min(n.energy for n in neighbors)
-            er_diff = er_max - er_min if (er_max - er_min) > 0 else 1.0
-            
-            # Probability is higher for nodes with more energy
-            p_ch = (node.energy - er_min) / er_diff
-            if random.random() < p_ch:
-                candidate_chs.append(node)
+        # With the static neighbor mask, the per-node energy extrema over
+        # alive neighbors reduce to three masked vector ops.
+        alive_mask = np.array([n.is_alive for n in nodes])
+        energies = np.array([n.energy for n in nodes])
+        nb = neighbor_mask & alive_mask[None, :]
+        has_neighbors = nb.any(axis=1)
+        er_max = np.where(nb, energies[None, :], -np.inf).max(axis=1)
+        er_min = np.where(nb, energies[None, :], np.inf).min(axis=1)
+        er_diff = np.where(er_max - er_min > 0, er_max - er_min, 1.0)
+        # Probability is higher for nodes with more energy
+        p_ch = (energies - er_min) / er_diff
+        draws = rng.random(len(nodes))
+        cand_mask = alive_mask & has_neighbors & (draws < p_ch)
 
         # --- Stage 2: Final CH Selection (Coverage & Load Balancing) ---
+        # Greedy set cover over the precomputed coverage matrix: each step is
+        # one masked AND + row sum instead of an O(candidates x uncovered)
+        # Python scan.
         final_chs = []
-        uncovered_nodes = list(alive_nodes)
-        
-        while uncovered_nodes and candidate_chs:
-            best_candidate = None
-            max_coverage = -1
-            
-            # Find the candidate that covers the most uncovered nodes
-            for cand in candidate_chs:
-                covered_count = sum(1 for n in uncovered_nodes if math.hypot(n.x - cand.x, n.y - cand.y) <= CH_COVERAGE_RADIUS)
-                if covered_count > max_coverage:
-                    max_coverage = covered_count
-                    best_candidate = cand
-            
-            if best_candidate:
-                final_chs.append(best_candidate)
-                candidate_chs.remove(best_candidate)
-                # Update the list of uncovered nodes
-                uncovered_nodes = [n for n in uncovered_nodes if math.hypot(n.x - best_candidate.x, n.y - best_candidate.y) > CH_COVERAGE_RADIUS]
-            else:
-                # No candidate can cover any more nodes, so break
-                break
+        uncovered = alive_mask.copy()
+
+        while uncovered.any() and cand_mask.any():
+            cand_indices = np.flatnonzero(cand_mask)
+            covered_counts = (cover_mask[cand_indices] & uncovered).sum(axis=1)
+            # Pick the candidate that covers the most uncovered nodes
+            best = cand_indices[np.argmax(covered_counts)]
+            final_chs.append(nodes[best])
+            cand_mask[best] = False
+            uncovered &= ~cover_mask[best]
         
         if not final_chs and alive_nodes:
             final_chs.append(max(alive_nodes, key=lambda n: n.energy))
@@ -106,71 +124,72 @@ def run_mrpgtco_simulation(rounds=2000):
         # --- Data Transmission Phase ---
         
         # 1. Non-CH nodes transmit to their nearest CH
-        ch_data_load = defaultdict(lambda: 1) # Each CH starts with its own packet
-        for node in alive_nodes:
-            if not node.is_CH and final_chs:
-                node.cluster = min(final_chs, key=lambda ch: math.hypot(node.x - ch.x, node.y - ch.y))
-                if node.cluster and node.cluster.is_alive:
-                    dist = math.hypot(node.x - node.cluster.x, node.y - node.cluster.y)
-                    if node.energy > tx_energy(PACKET_SIZE, dist):
-                        node.energy -= tx_energy(PACKET_SIZE, dist)
-                        node.cluster.energy -= rx_energy(PACKET_SIZE)
-                        ch_data_load[node.cluster.id] += 1
+        # Dense per-node packet counts indexed by id: each CH starts with its
+        # own packet, and lookups skip the dict hashing a defaultdict costs.
+        data_load = np.ones(len(nodes), dtype=np.int32)
+        ch_x = np.array([c.x for c in final_chs]); ch_y = np.array([c.y for c in final_chs])
+        members = [n for n in alive_nodes if not n.is_CH]
+        if members and final_chs:
+            # Broadcast member-to-CH distances instead of min(..., key=hypot) per node.
+            mx = np.array([n.x for n in members]); my = np.array([n.y for n in members])
+            d2 = (mx[:, None] - ch_x[None, :])**2 + (my[:, None] - ch_y[None, :])**2
+            nearest = np.argmin(d2, axis=1)
+            member_tx = PACKET_SIZE * tx_coeff(d2[np.arange(len(members)), nearest])
+            for node, j, e_tx in zip(members, nearest, member_tx):
+                node.cluster = final_chs[j]
+                if node.cluster.is_alive and node.energy > e_tx:
+                    node.energy -= e_tx
+                    node.cluster.energy -= e_rx
+                    data_load[node.cluster.id] += 1
 
         # 2. CHs aggregate data
         for ch in final_chs:
             if not ch.is_alive: continue
-            num_packets_aggregated = ch_data_load[ch.id] - 1
+            num_packets_aggregated = data_load[ch.id] - 1
             if num_packets_aggregated > 0:
                 ch.energy -= num_packets_aggregated * PACKET_SIZE * E_DA
 
         # 3. CHs transmit to BS (with multi-hop relay logic)
-        sorted_chs = sorted(final_chs, key=lambda c: math.hypot(c.x-BS_POS[0], c.y-BS_POS[1]), reverse=True)
-
-        for ch in sorted_chs:
-            if not ch.is_alive: continue
-            
-            total_bits = ch_data_load[ch.id] * PACKET_SIZE
-            
-            dist_direct_to_bs = math.hypot(ch.x - BS_POS[0], ch.y - BS_POS[1])
-            cost_direct = tx_energy(total_bits, dist_direct_to_bs)
-
-            best_relay = None
-            min_cost = cost_direct
-            
-            # Find the best relay (another CH that is closer to the BS)
-            for relay in final_chs:
-                if relay.id == ch.id or not relay.is_alive: continue
-                
-                dist_ch_to_relay = math.hypot(ch.x - relay.x, ch.y - relay.y)
-                dist_relay_to_bs = math.hypot(relay.x - BS_POS[0], relay.y - BS_POS[1])
-                
-                if dist_relay_to_bs < dist_direct_to_bs and dist_ch_to_relay < DO * 2: # Relay must be closer
-                    cost_via_relay = tx_energy(total_bits, dist_ch_to_relay)
-                    if cost_via_relay < min_cost:
-                        min_cost = cost_via_relay
-                        best_relay = relay
-            
-            # Execute transmission
-            if best_relay:
+        # Aliveness only changes in the end-of-round status scan, so the
+        # whole relay selection is independent per CH and collapses into a
+        # few masked matrix ops over the CH subset of the static distances.
+        ch_ids = np.array([c.id for c in final_chs])
+        d_ch_bs = np.array([c.dist_bs for c in final_chs])
+        coeff_ch_bs = np.array([c.coeff_bs for c in final_chs])
+        total_bits = data_load[ch_ids] * PACKET_SIZE
+
+        d2_cc = d2_all[np.ix_(ch_ids, ch_ids)]
+        # A relay must be strictly closer to the BS and within 2*DO
+        valid = (d_ch_bs[None, :] < d_ch_bs[:, None]) & \
+                (d2_cc < 4 * DO2) & \
+                ~np.eye(len(final_chs), dtype=bool)
+        relay_costs = np.where(valid, total_bits[:, None] * tx_coeff(d2_cc), np.inf)
+        best_relay = relay_costs.argmin(axis=1)
+        best_cost = relay_costs[np.arange(len(final_chs)), best_relay]
+        cost_direct = total_bits * coeff_ch_bs
+        use_relay = best_cost < cost_direct
+
+        # Execute transmissions: commit the per-object energy debits
+        for i, ch in enumerate(final_chs):
+            if use_relay[i]:
+                relay = final_chs[best_relay[i]]
                 # Transmit to relay
-                ch.energy -= tx_energy(total_bits, math.hypot(ch.x - best_relay.x, ch.y - best_relay.y))
+                ch.energy -= best_cost[i]
                 # The relay's load for the *next* round would increase, but for this round,
                 # we assume it aggregates and forwards immediately.
-                best_relay.energy -= rx_energy(total_bits)
-                best_relay.energy -= tx_energy(total_bits, math.hypot(best_relay.x - BS_POS[0], best_relay.y - BS_POS[1]))
+                relay.energy -= rx_energy(total_bits[i])
+                relay.energy -= total_bits[i] * relay.coeff_bs
             else:
                 # Transmit directly
-                ch.energy -= cost_direct
+                ch.energy -= cost_direct[i]
 
         # Update node status
         for node in nodes:
-            if node.energy <= 0:
+            if node.is_alive and node.energy <= 0:
                 node.is_alive = False
+                n_alive -= 1
 
-        alive_nodes_count.append(sum(1 for n in nodes if n.is_alive))
+        alive_arr[r - 1] = n_alive
 
-    while len(alive_nodes_count) < rounds:
-        alive_nodes_count.append(0)
-        
-    return pd.DataFrame({'round': range(1, rounds + 1), 'alive_nodes': alive_nodes_count}), None
+    return pd.DataFrame({'round': np.arange(1, rounds + 1, dtype=np.int32),
+                         'alive_nodes': alive_arr}), None
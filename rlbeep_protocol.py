@@ -1,9 +1,20 @@
 # rlbeep_protocol.py - CORRECTED Implementation of Abadi et al. "RLBEEP"
 
-import math, random
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 import pandas as pd
 import numpy as np
-from collections import defaultdict
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; fall back to the plain-Python kernel
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        def wrap(func): return func
+        return wrap
 
 # --- Standard Parameters ---
 N_NODES = 100
@@ -15,6 +26,7 @@ E_DA = 0.5e-9
 E_FS = 10e-12
 E_MP = 0.0013e-12
 DO = math.sqrt(E_FS / E_MP)
+DO2 = DO * DO # compare squared distances against the squared crossover
 INITIAL_ENERGY = 0.5
 SEED = 42
 
@@ -24,105 +36,220 @@ DISCOUNT_FACTOR = 0.5
 EPSILON = 0.2
 P_OPT = 0.1 # Use a higher CH probability for stability
 
-random.seed(SEED)
-np.random.seed(SEED)
-
-class Node:
-    def __init__(self, nid, x, y, energy=INITIAL_ENERGY):
-        self.id = nid; self.x = x; self.y = y; self.energy = energy
-        self.is_alive = True; self.is_CH = False; self.cluster = None
-        self.q_table = defaultdict(float)
-
-def tx_energy(bits, dist):
-    if dist <= DO: return bits * (E_ELEC + E_FS * (dist**2))
-    else: return bits * (E_ELEC + E_MP * (dist**4))
-
+@dataclass
+class NodeArrays:
+    # Structure-of-arrays node state, as in abose_protocol: one contiguous
+    # array per field so the per-round bookkeeping indexes arrays instead of
+    # chasing Node objects.
+    x: np.ndarray        # float64, node x coordinates
+    y: np.ndarray        # float64, node y coordinates
+    energy: np.ndarray   # float64, residual energy per node
+    alive: np.ndarray    # bool
+    is_CH: np.ndarray    # bool
+    cluster: np.ndarray  # int32, index of assigned CH (-1 = none)
+
+# Eager (explicit-signature) compilation, as in abose_protocol: the kernels
+# are compiled at import time rather than on first call, and cache=True
+# persists the machine code on disk, so main_comparison's workers don't each
+# pay first-call JIT latency. The module-level parameters (E_ELEC, E_FS,
+# E_MP, DO2, LEARNING_RATE, DISCOUNT_FACTOR, EPSILON, ...) are frozen into
+# the compiled code as immediates — Numba reads globals once at compile
+# time — so every kernel is already specialized to the fixed simulation
+# constants; edits to the parameters need a recompile (the on-disk cache
+# invalidates automatically with the source).
+@njit("f8(i8, f8)", cache=True, fastmath=True)
+def tx_energy_sq(bits, d2):
+    # Branchless select over *squared* distance: the radio model only needs
+    # d^2 and d^4, so callers never pay for a sqrt, and the flag form
+    # compiles to straight-line code (the d2 distribution straddles DO2).
+    fs = E_FS * d2
+    return bits * (E_ELEC + fs + (E_MP * d2 * d2 - fs) * (d2 > DO2))
+
+@njit("f8(i8)", cache=True, fastmath=True)
 def rx_energy(bits): return bits * E_ELEC
 
-def create_nodes(n=N_NODES):
-    return [Node(i, random.uniform(0, AREA_SIDE), random.uniform(0, AREA_SIDE)) for i in range(n)]
-
-def calculate_reward(neighbor_node):
-    dist_to_bs = math.hypot(neighbor_node.x - BS_POS[0], neighbor_node.y - BS_POS[1])
-    return neighbor_node.energy / (dist_to_bs + 1e-6)
+def create_nodes(rng, n=N_NODES):
+    # One C-level RNG call per coordinate array instead of 2N Python calls.
+    return NodeArrays(x=rng.uniform(0, AREA_SIDE, n),
+                      y=rng.uniform(0, AREA_SIDE, n),
+                      energy=np.full(n, INITIAL_ENERGY),
+                      alive=np.ones(n, dtype=bool),
+                      is_CH=np.zeros(n, dtype=bool),
+                      cluster=np.full(n, -1, dtype=np.int32))
+
+@njit("void(f8[:], f8[:], f8[:], i4[:], i8[:], i8[:], i8[:])",
+      cache=True, fastmath=True)
+def _member_tx(x, y, energy, cluster, member_idx, ch_arr, load_arr):
+    # Fused member-transmission pass: one streaming loop per member finds the
+    # nearest CH, debits the TX energy and counts the CH's packet, replacing
+    # the broadcast distance matrix and its where/bincount temporaries.
+    for k in range(member_idx.size):
+        i = member_idx[k]
+        best_d2 = np.inf
+        best_j = 0
+        for j in range(ch_arr.size):
+            d2 = (x[i] - x[ch_arr[j]])**2 + (y[i] - y[ch_arr[j]])**2
+            if d2 < best_d2:
+                best_d2 = d2; best_j = j
+        cluster[i] = ch_arr[best_j]
+        energy[i] -= tx_energy_sq(PACKET_SIZE, best_d2)
+        load_arr[best_j] += 1
+    e_rx = rx_energy(PACKET_SIZE)
+    for j in range(ch_arr.size):
+        energy[ch_arr[j]] -= e_rx * load_arr[j]
+
+@njit("void(i8)", cache=True)
+def _seed_kernel(seed):
+    # Numba kernels use their own RNG state; seed it once at import so a
+    # fresh import reproduces the same routing decisions.
+    np.random.seed(seed)
+
+@njit("void(f8[:], f8[:], f8[:], b1[:], f8[:, :], i8[:], i8[:])",
+      cache=True, fastmath=True)
+def _route_data(x, y, energy, alive, q_table, ch_arr, data_load):
+    """Route every CH's aggregated data toward the BS with eps-greedy Q-hops.
+
+    The whole hop loop runs on typed arrays: q_table is a dense (N, N)
+    matrix indexed by node id (entries default to 0 like the old dict
+    lookups), and aggregation/TX/RX debits are applied in place.
+    """
+    n_ch = ch_arr.size
+    # Alive flags only change in the end-of-round scan, so the alive-CH
+    # count is invariant across the whole routing phase.
+    n_alive_ch = 0
+    for k in range(n_ch):
+        if alive[ch_arr[k]]:
+            n_alive_ch += 1
+    # CH positions are fixed for the round, so the BS distances the hop
+    # loop keeps re-deriving are computed once per CH up front.
+    ch_d2_bs = np.empty(n_ch)
+    for k in range(n_ch):
+        ch_d2_bs[k] = (x[ch_arr[k]] - BS_POS[0])**2 + (y[ch_arr[k]] - BS_POS[1])**2
+    for a in range(n_ch):
+        ch = ch_arr[a]
+        if not alive[ch]:
+            continue
+
+        load = data_load[a]
+        total_bits = (load + 1) * PACKET_SIZE
+        energy[ch] -= load * PACKET_SIZE * E_DA
+
+        cur = a
+        while alive[ch_arr[cur]] and ch_d2_bs[cur] > DO2:
+            ci = ch_arr[cur]
+            # Neighbors are the other alive CHs; the current CH is alive
+            # here, so one exists iff at least two CHs are alive.
+            if n_alive_ch < 2:
+                break
+
+            nxt = -1
+            if np.random.random() < EPSILON:
+                # Rejection-sample a uniform alive neighbor: a few cycles
+                # per retry instead of a counting pass plus an enumeration
+                # walk over the CH list.
+                while True:
+                    k = np.random.randint(0, n_ch)
+                    if alive[ch_arr[k]] and k != cur:
+                        nxt = k
+                        break
+            else:
+                # Greedy argmax over the dense Q-row: a flat compare loop
+                # with no dict lookups, amenable to auto-vectorization.
+                q_row = q_table[ci]
+                best_q = -np.inf
+                for k in range(n_ch):
+                    if alive[ch_arr[k]] and k != cur:
+                        q_val = q_row[ch_arr[k]]
+                        if q_val > best_q:
+                            best_q = q_val; nxt = k
+
+            ni = ch_arr[nxt]
+            d2 = (x[ci] - x[ni])**2 + (y[ci] - y[ni])**2
+            energy[ci] -= tx_energy_sq(total_bits, d2)
+            energy[ni] -= rx_energy(total_bits)
+
+            # The reward really is per metre, so this sqrt stays.
+            dist_to_bs = math.sqrt(ch_d2_bs[nxt])
+            reward = energy[ni] / (dist_to_bs + 1e-6)
+            found = False
+            max_q_next = 0.0
+            q_next_row = q_table[ni]
+            for k in range(n_ch):
+                if alive[ch_arr[k]] and k != cur and k != nxt:
+                    q_val = q_next_row[ch_arr[k]]
+                    if not found or q_val > max_q_next:
+                        max_q_next = q_val; found = True
+            old_q = q_table[ci, ni]
+            q_table[ci, ni] = old_q + LEARNING_RATE * (reward + DISCOUNT_FACTOR * max_q_next - old_q)
+
+            cur = nxt
+
+        ci = ch_arr[cur]
+        if alive[ci]:
+            energy[ci] -= tx_energy_sq(total_bits, ch_d2_bs[cur])
+
+def run_rlbeep_simulation(rounds=2000, seed=SEED, return_array=False):
+    # Each replication owns its RNG state: a fresh Generator for the Python
+    # side and a reseed of the kernel's internal RNG, so replicates are
+    # independent and reproducible regardless of process or call order.
+    rng = np.random.default_rng(seed)
+    _seed_kernel(seed)
+    na = create_nodes(rng)
+    # Preallocated result column: zeros double as padding if the network
+    # dies before the last round.
+    alive_arr = np.zeros(rounds, dtype=np.int32)
+    # Dense Q-table indexed by node id, persisting across rounds exactly as
+    # the old per-node dicts did.
+    q_table = np.zeros((N_NODES, N_NODES))
+    n_alive = N_NODES
 
-def run_rlbeep_simulation(rounds=2000):
-    nodes = create_nodes(N_NODES)
-    alive_nodes_count = []
-    
     for r in range(1, rounds + 1):
-        alive_nodes = [n for n in nodes if n.is_alive]
-        if not alive_nodes: break
+        if n_alive == 0: break
+        alive_idx = np.flatnonzero(na.alive)
 
         # 1. Clustering Phase (essential for fair comparison)
-        for node in nodes: node.is_CH = False; node.cluster = None
-        
-        CHs = []
-        for node in alive_nodes:
-            if random.random() < P_OPT:
-                node.is_CH = True
-                CHs.append(node)
-        
-        if not CHs and alive_nodes:
-            best_node = max(alive_nodes, key=lambda n: n.energy)
-            best_node.is_CH = True; CHs.append(best_node)
-
-        for node in alive_nodes:
-            if not node.is_CH and CHs:
-                node.cluster = min(CHs, key=lambda ch: math.hypot(node.x - ch.x, node.y - ch.y))
-
-        # 2. Data transmission from non-CH to CH
-        ch_data_load = defaultdict(int)
-        for node in alive_nodes:
-            if not node.is_CH and node.cluster and node.cluster.is_alive:
-                dist = math.hypot(node.x - node.cluster.x, node.y - node.cluster.y)
-                node.energy -= tx_energy(PACKET_SIZE, dist)
-                node.cluster.energy -= rx_energy(PACKET_SIZE)
-                ch_data_load[node.cluster.id] += 1
-
-        # 3. CHs use RL to route data to BS
-        for ch in CHs:
-            if not ch.is_alive: continue
-            
-            total_bits = (ch_data_load[ch.id] + 1) * PACKET_SIZE
-            ch.energy -= ch_data_load[ch.id] * PACKET_SIZE * E_DA
-
-            current_ch = ch
-            while current_ch.is_alive and math.hypot(current_ch.x - BS_POS[0], current_ch.y - BS_POS[1]) > DO:
-                # Neighbors are other CHs
-                alive_ch_neighbors = [c for c in CHs if c.is_alive and c.id != current_ch.id]
-                if not alive_ch_neighbors: break
-
-                next_hop = None
-                if random.random() < EPSILON:
-                    next_hop = random.choice(alive_ch_neighbors)
-                else:
-                    best_q = -float('inf')
-                    for neighbor in alive_ch_neighbors:
-                        q_val = current_ch.q_table.get(neighbor.id, 0)
-                        if q_val > best_q: best_q = q_val; next_hop = neighbor
-                    if not next_hop: next_hop = random.choice(alive_ch_neighbors)
-                
-                dist = math.hypot(current_ch.x - next_hop.x, current_ch.y - next_hop.y)
-                current_ch.energy -= tx_energy(total_bits, dist)
-                next_hop.energy -= rx_energy(total_bits)
-                
-                reward = calculate_reward(next_hop)
-                max_q_next = max([next_hop.q_table.get(c.id,0) for c in alive_ch_neighbors if c.id != next_hop.id] or [0])
-                old_q = current_ch.q_table.get(next_hop.id, 0)
-                new_q = old_q + LEARNING_RATE * (reward + DISCOUNT_FACTOR * max_q_next - old_q)
-                current_ch.q_table[next_hop.id] = new_q
-                
-                current_ch = next_hop
-
-            if current_ch.is_alive:
-                dist_bs = math.hypot(current_ch.x - BS_POS[0], current_ch.y - BS_POS[1])
-                current_ch.energy -= tx_energy(total_bits, dist_bs)
-
-        for node in nodes:
-            if node.energy <= 0: node.is_alive = False
-
-        alive_nodes_count.append(sum(1 for n in nodes if n.is_alive))
-        
-    while len(alive_nodes_count) < rounds: alive_nodes_count.append(0)
-    return pd.DataFrame({'round': range(1, rounds + 1), 'alive_nodes': alive_nodes_count}), None
+        # ndarray.fill is a single memset-style call, the cheapest reset.
+        na.is_CH.fill(False)
+        na.cluster.fill(-1)
+
+        # One batched draw decides all CH elections for the round.
+        elected = alive_idx[rng.random(alive_idx.size) < P_OPT]
+        na.is_CH[elected] = True
+        if elected.size == 0:
+            na.is_CH[alive_idx[np.argmax(na.energy[alive_idx])]] = True
+
+        member_idx = alive_idx[~na.is_CH[alive_idx]]
+        ch_arr = np.flatnonzero(na.is_CH)
+
+        # 2. Data transmission from non-CH to CH. Aliveness flags only change
+        # in the end-of-round scan, so every assigned CH is alive here and the
+        # whole member phase runs in one fused kernel pass.
+        load_arr = np.zeros(ch_arr.size, dtype=np.int64)
+        _member_tx(na.x, na.y, na.energy, na.cluster, member_idx, ch_arr, load_arr)
+
+        # 3. CHs use RL to route data to BS (whole hop loop runs in the kernel)
+        _route_data(na.x, na.y, na.energy, na.alive, q_table, ch_arr, load_arr)
+
+        # Running alive counter: decrement by the newly dead instead of
+        # re-counting the whole array every round.
+        newly_dead = np.flatnonzero(na.alive & (na.energy <= 0))
+        na.alive[newly_dead] = False
+        n_alive -= newly_dead.size
+
+        alive_arr[r - 1] = n_alive
+
+    if return_array:
+        # Sweep callers consume only the alive counts; hand back the raw
+        # column and skip the DataFrame construction per replicate.
+        return alive_arr
+    return pd.DataFrame({'round': np.arange(1, rounds + 1, dtype=np.int32),
+                         'alive_nodes': alive_arr}), None
+
+def run_many(seeds, rounds=2000, return_array=False):
+    # Replications are embarrassingly parallel (no shared state), so fan
+    # them out across worker processes, one per seed. With
+    # return_array=True the results stack directly into a (seeds, rounds)
+    # matrix for statistics.
+    with ProcessPoolExecutor() as ex:
+        return list(ex.map(partial(run_rlbeep_simulation, rounds,
+                                   return_array=return_array), seeds))
@@ -1,8 +1,18 @@
 import math
-import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 import pandas as pd
 import numpy as np
-from collections import defaultdict
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; fall back to the plain-Python kernel
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        def wrap(func): return func
+        return wrap
 
 # --- Standard Parameters ---
 N_NODES = 100
@@ -14,6 +24,7 @@ E_DA = 0.5e-9
 E_FS = 10e-12
 E_MP = 0.0013e-12
 DO = math.sqrt(E_FS / E_MP) if E_MP > 0 else 87.0
+DO2 = DO * DO # compare squared distances against the squared crossover
 INITIAL_ENERGY = 0.5
 SEED = 42
 
@@ -27,98 +38,155 @@ W_DIST = 0.3
 W_ENERGY = 0.4
 W_DENSITY = 0.3
 
-random.seed(SEED)
-np.random.seed(SEED)
-
-class Node:
-    def __init__(self, nid, x, y, energy=INITIAL_ENERGY):
-        self.id = nid
-        self.x = x
-        self.y = y
-        self.energy = energy
-        self.is_alive = True
-        self.is_CH = False
-        self.sector = -1
-        self.priority = 0.0
-
-def tx_energy(bits, dist):
-    if dist <= DO:
-        return bits * (E_ELEC + E_FS * (dist ** 2))
-    else:
-        return bits * (E_ELEC + E_MP * (dist ** 4))
-
+@dataclass
+class NodeArrays:
+    # Structure-of-arrays node state, as in abose_protocol: one contiguous
+    # array per field so the per-round bookkeeping indexes arrays instead of
+    # chasing Node objects.
+    x: np.ndarray        # float64, node x coordinates
+    y: np.ndarray        # float64, node y coordinates
+    energy: np.ndarray   # float64, residual energy per node
+    alive: np.ndarray    # bool
+    is_CH: np.ndarray    # bool
+    sector: np.ndarray   # int32, sector id (-1 = unassigned)
+    priority: np.ndarray # float64, CH-election priority
+
+# Eager (explicit-signature) compilation, as in rlbeep_protocol: the kernels
+# compile at import and cache=True persists the machine code on disk, with
+# the module-level parameters frozen in as compile-time immediates.
+@njit("f8(i8, f8)", cache=True, fastmath=True)
+def tx_energy_sq(bits, d2):
+    # Branchless select over *squared* distance: the radio model only needs
+    # d^2 and d^4, so callers never pay for a sqrt, and the flag form
+    # compiles to straight-line code (the d2 distribution straddles DO2).
+    fs = E_FS * d2
+    return bits * (E_ELEC + fs + (E_MP * d2 * d2 - fs) * (d2 > DO2))
+
+def tx_coeff(d2):
+    # Per-bit TX energy coefficient from squared distance, vector form as in
+    # eerpms_protocol.
+    return E_ELEC + np.where(d2 <= DO2, E_FS * d2, E_MP * d2 * d2)
+
+@njit("f8(i8)", cache=True, fastmath=True)
 def rx_energy(bits):
     return bits * E_ELEC
 
-def create_nodes(n=N_NODES):
-    return [Node(i, random.uniform(0, AREA_SIDE), random.uniform(0, AREA_SIDE)) for i in range(n)]
-
-def run_sector_simulation(rounds=2000):
-    nodes = create_nodes(N_NODES)
-    alive_nodes_count = []
-    residual_energy = []
+@njit("void(f8[:], f8[:], f8[:], i8[:], i8[:], i8[:])", cache=True, fastmath=True)
+def _member_tx(x, y, energy, m, c, ch_idx):
+    # Fused member-transmission pass: one streaming loop computes each
+    # member's distance and TX debit and accumulates its CH's packet count,
+    # replacing the broadcast hypot/where/bincount temporaries.
+    load = np.zeros(x.size, dtype=np.int64)
+    for k in range(m.size):
+        d2 = (x[m[k]] - x[c[k]])**2 + (y[m[k]] - y[c[k]])**2
+        energy[m[k]] -= tx_energy_sq(PACKET_SIZE, d2)
+        load[c[k]] += 1
+    e_rx = rx_energy(PACKET_SIZE)
+    for k in range(ch_idx.size):
+        energy[ch_idx[k]] -= e_rx * load[ch_idx[k]]
+
+def create_nodes(rng, n=N_NODES):
+    # One C-level RNG call per coordinate array instead of 2N Python calls.
+    return NodeArrays(x=rng.uniform(0, AREA_SIDE, n),
+                      y=rng.uniform(0, AREA_SIDE, n),
+                      energy=np.full(n, INITIAL_ENERGY),
+                      alive=np.ones(n, dtype=bool),
+                      is_CH=np.zeros(n, dtype=bool),
+                      sector=np.full(n, -1, dtype=np.int32),
+                      priority=np.zeros(n))
+
+def run_sector_simulation(rounds=2000, seed=SEED, return_array=False):
+    # Each replication owns its RNG state, so replicates are independent
+    # and reproducible regardless of process or call order.
+    rng = np.random.default_rng(seed)
+    na = create_nodes(rng)
+    # Preallocated result column: zeros double as padding if the network
+    # dies before the last round.
+    alive_arr = np.zeros(rounds, dtype=np.int32)
+    # Running alive counter, decremented at the death sites instead of
+    # re-counted (twice) every round.
+    n_alive = N_NODES
+
+    # 1. Sectorization: positions are static, so one vectorized arctan2 at
+    # simulation start replaces the per-node atan2/degrees/branch work that
+    # ran every round (np.mod is the branchless form of the +360 fixup).
+    ang = np.mod(np.degrees(np.arctan2(na.y - BS_POS[1], na.x - BS_POS[0])), 360.0)
+    na.sector[:] = (ang / SECTOR_ANGLE).astype(np.int32)
+
+    # The distance term of the priority depends only on position, so it is
+    # also computed once.
+    loc_term = W_DIST * (1 - np.hypot(na.x - BS_POS[0], na.y - BS_POS[1]) / (AREA_SIDE * 1.414))
 
     for r in range(1, rounds + 1):
-        sectors = defaultdict(list)
-
-        for node in nodes:
-            node.is_CH = False
-            if not node.is_alive:
-                continue
-
-            # 1. Sectorization
-            angle = math.degrees(math.atan2(node.y - BS_POS[1], node.x - BS_POS[0]))
-            if angle < 0:
-                angle += 360
-            node.sector = int(angle / SECTOR_ANGLE)
-            sectors[node.sector].append(node)
-
-        CHs = []
-        for sector_id, sector_nodes in sectors.items():
-            if not sector_nodes:
-                continue
-
-            # 2. Priority Calculation
-            for node in sector_nodes:
-                dist_to_bs = math.hypot(node.x - BS_POS[0], node.y - BS_POS[1])
-                node_density = len(sector_nodes)
-
-                node.priority = (
-                    W_ENERGY * (node.energy / INITIAL_ENERGY) +
-                    W_DIST * (1 - dist_to_bs / (AREA_SIDE * 1.414)) +
-                    W_DENSITY * (node_density / len(nodes))
-                )
-
-            # 3. CH Selection
-            ch = max(sector_nodes, key=lambda n: n.priority)
-            ch.is_CH = True
-            CHs.append(ch)
-
-        alive_nodes = [n for n in nodes if n.is_alive]
-        for node in alive_nodes:
-            if not node.is_CH:
-                ch_in_sector = next((c for c in CHs if c.sector == node.sector), None)
-                if ch_in_sector:
-                    dist = math.hypot(node.x - ch_in_sector.x, node.y - ch_in_sector.y)
-                    node.energy -= tx_energy(PACKET_SIZE, dist)
-                    ch_in_sector.energy -= rx_energy(PACKET_SIZE)
-                    if node.energy <= 0:
-                        node.is_alive = False
-
-        for ch in CHs:
-            if not ch.is_alive:
-                continue
-            dist_bs = math.hypot(ch.x - BS_POS[0], ch.y - BS_POS[1])
-            ch.energy -= tx_energy(PACKET_SIZE, dist_bs)
-            if ch.energy <= 0:
-                ch.is_alive = False
-
-        alive_nodes_count.append(sum(1 for n in nodes if n.is_alive))
-        if sum(1 for n in nodes if n.is_alive) == 0:
+        na.is_CH.fill(False)
+
+        alive_idx = np.flatnonzero(na.alive)
+
+        # 2. Priority Calculation, vectorized over all alive nodes: the
+        # per-sector density is one bincount and each score is one array
+        # expression instead of a Python loop per sector.
+        density = np.bincount(na.sector[alive_idx], minlength=NUM_SECTORS)
+        na.priority[alive_idx] = (
+            W_ENERGY * (na.energy[alive_idx] / INITIAL_ENERGY) +
+            loc_term[alive_idx] +
+            W_DENSITY * (density[na.sector[alive_idx]] / N_NODES)
+        )
+
+        # 3. CH Selection: a stable argsort turns each sector into a
+        # contiguous slice (as in eerpms_protocol) and a small per-sector
+        # argmax picks the CH.
+        order = np.argsort(na.sector[alive_idx], kind='stable')
+        sorted_idx = alive_idx[order]
+        s_sorted = na.sector[sorted_idx]
+        starts = np.flatnonzero(np.r_[True, s_sorted[1:] != s_sorted[:-1]])
+        seg_len = np.diff(np.append(starts, s_sorted.size))
+        pri_sorted = na.priority[sorted_idx]
+
+        ch_idx = np.empty(starts.size, dtype=np.int64)
+        for s in range(starts.size):
+            a = starts[s]
+            ch_idx[s] = sorted_idx[a + np.argmax(pri_sorted[a:a + seg_len[s]])]
+        na.is_CH[ch_idx] = True
+
+        # A dense sector -> CH lookup replaces the per-node linear scan over
+        # the CH list; member debits then collapse into vectorized gathers.
+        ch_of_sector = np.full(NUM_SECTORS, -1, dtype=np.int64)
+        ch_of_sector[na.sector[ch_idx]] = ch_idx
+
+        member_idx = alive_idx[~na.is_CH[alive_idx]]
+        my_ch = ch_of_sector[na.sector[member_idx]]
+        served = my_ch >= 0
+        m = member_idx[served]; c = my_ch[served]
+        if m.size:
+            _member_tx(na.x, na.y, na.energy, m, c, ch_idx)
+            dead = m[na.energy[m] <= 0]
+            na.alive[dead] = False
+            n_alive -= dead.size
+
+        # CHs come from the alive sector lists and their alive flags cannot
+        # have been cleared above, so their BS transmissions vectorize.
+        d2_bs = (na.x[ch_idx] - BS_POS[0])**2 + (na.y[ch_idx] - BS_POS[1])**2
+        na.energy[ch_idx] -= PACKET_SIZE * tx_coeff(d2_bs)
+        dead_chs = ch_idx[na.energy[ch_idx] <= 0]
+        na.alive[dead_chs] = False
+        n_alive -= dead_chs.size
+
+        alive_arr[r - 1] = n_alive
+        if n_alive == 0:
             break
 
-    while len(alive_nodes_count) < rounds:
-        alive_nodes_count.append(0)
-
-    return pd.DataFrame({'round': range(1, rounds + 1), 'alive_nodes': alive_nodes_count}), None
-
+    if return_array:
+        # Sweep callers consume only the alive counts; hand back the raw
+        # column and skip the DataFrame construction per replicate.
+        return alive_arr
+    return pd.DataFrame({'round': np.arange(1, rounds + 1, dtype=np.int32),
+                         'alive_nodes': alive_arr}), None
+
+def run_many(seeds, rounds=2000, return_array=False):
+    # Replications are embarrassingly parallel (no shared state), so fan
+    # them out across worker processes, one per seed. With
+    # return_array=True the results stack directly into a (seeds, rounds)
+    # matrix for statistics.
+    with ProcessPoolExecutor() as ex:
+        return list(ex.map(partial(run_sector_simulation, rounds,
+                                   return_array=return_array), seeds))